@@ -17,6 +17,11 @@ import pandas as pd
 import numpy as np
 import joblib
 import os
+import sklearn
+from typing import NamedTuple
+
+# Slider inputs are always finite, so skip sklearn's per-call NaN/inf scan
+sklearn.set_config(assume_finite=True)
 
 # ------------------------
 # Config
@@ -44,16 +49,26 @@ DISPLAY_NAMES = {
     "avg_gap_days": "Avg Days Between Orders",
 }
 
+
+class FeatureStats(NamedTuple):
+    """Slider parameters per feature, one array entry per FEATURE_COLS column."""
+    labels: tuple
+    mins: np.ndarray
+    maxs: np.ndarray
+    medians: np.ndarray
+    steps: np.ndarray
+
+
 # ------------------------
 # Helpers: load model + data
 # ------------------------
 
-def get_model_path():
-    """Get the model path, checking multiple locations."""
+def _resolve_path(filename):
+    """Get an artifact path, checking multiple locations for models/."""
     possible_paths = [
-        "../models/churn_pipe.pkl",
-        "models/churn_pipe.pkl",
-        os.path.join(os.path.dirname(__file__), "..", "models", "churn_pipe.pkl"),
+        os.path.join("..", "models", filename),
+        os.path.join("models", filename),
+        os.path.join(os.path.dirname(__file__), "..", "models", filename),
     ]
     for path in possible_paths:
         if os.path.exists(path):
@@ -61,43 +76,64 @@ def get_model_path():
     return possible_paths[0]  # Default
 
 
-def get_data_path():
-    """Get the data path, checking multiple locations."""
-    possible_paths = [
-        "../models/churn_features.csv",
-        "models/churn_features.csv",
-        os.path.join(os.path.dirname(__file__), "..", "models", "churn_features.csv"),
-    ]
-    for path in possible_paths:
-        if os.path.exists(path):
-            return path
-    return possible_paths[0]  # Default
-
-
-@st.cache_resource
+@st.cache_resource(max_entries=1, show_spinner=False)
 def load_model():
     """Load trained sklearn pipeline."""
-    path = get_model_path()
+    # Resolved here so the filesystem is only probed on a cache miss
+    path = _resolve_path("churn_pipe.pkl")
     try:
-        return joblib.load(path)
+        # Memory-map the fitted arrays instead of copying them into RAM
+        pipe = joblib.load(path, mmap_mode="r")
     except FileNotFoundError:
         st.error(f"Model file not found at: {path}")
         st.info("Please ensure churn_pipe.pkl is in the models/ directory.")
         return None
+    
+    # Inputs are passed as bare arrays in FEATURE_COLS order, so check the
+    # fitted column order once here instead of on every predict call
+    fitted_cols = getattr(pipe, "feature_names_in_", None)
+    if fitted_cols is not None:
+        if list(fitted_cols) != FEATURE_COLS:
+            st.error("Model was trained on different features than FEATURE_COLS.")
+            return None
+        del pipe.steps[0][1].feature_names_in_
+    return pipe
 
 
 @st.cache_data
 def load_data():
     """Load feature data for slider ranges."""
-    path = get_data_path()
+    path = _resolve_path("churn_features.csv")
     try:
-        return pd.read_csv(path)
+        return pd.read_csv(
+            path,
+            usecols=FEATURE_COLS,
+            engine="pyarrow",
+        )
     except FileNotFoundError:
         st.error(f"Data file not found at: {path}")
         st.info("Please ensure churn_features.csv is in the models/ directory.")
         return None
 
 
+@st.cache_data(show_spinner=False)
+def _compute_feature_stats(data: pd.DataFrame, cols: tuple) -> FeatureStats:
+    """Compute slider ranges (1st–99th percentiles), defaults and steps."""
+    # One vectorized pass over all feature columns (NaNs ignored per column)
+    arr = data[list(cols)].to_numpy(dtype=np.float64, copy=False)
+    q1, median, q99 = np.nanpercentile(arr, [1, 50, 99], axis=0)
+    
+    # ~100 steps across the range, never finer than 0.01
+    steps = np.maximum((q99 - q1) / 100, 0.01)
+    return FeatureStats(
+        labels=tuple(DISPLAY_NAMES.get(col, col) for col in cols),
+        mins=np.round(q1, 2),
+        maxs=np.round(q99, 2),
+        medians=np.round(median, 2),
+        steps=np.round(steps, 2),
+    )
+
+
 # ------------------------
 # Main App
 # ------------------------
@@ -123,16 +159,7 @@ def main():
     # Precompute slider ranges (1st–99th percentiles)
     # ------------------------
     
-    feature_stats = {}
-    for col in FEATURE_COLS:
-        s = data[col].dropna()
-        q1, q99 = s.quantile([0.01, 0.99])
-        median = s.median()
-        feature_stats[col] = {
-            "min": float(q1),
-            "max": float(q99),
-            "median": float(median),
-        }
+    feature_stats = _compute_feature_stats(data, tuple(FEATURE_COLS))
     
     # ------------------------
     # Sidebar: Customer Profile Inputs
@@ -142,40 +169,35 @@ def main():
     st.sidebar.markdown("Adjust the sliders to simulate different customer behaviors.")
     
     inputs = {}
-    for col in FEATURE_COLS:
-        stats = feature_stats[col]
-        label = DISPLAY_NAMES.get(col, col)
-    
-        span = stats["max"] - stats["min"]
-        step = span / 100 if span > 0 else 0.01
-        step = max(step, 0.01)
+    for i, col in enumerate(FEATURE_COLS):
+        label = feature_stats.labels[i]
     
         if col == "marketing_optin":
             # Binary toggle instead of slider
-            default_idx = int(round(stats["median"]))
+            default_idx = int(round(feature_stats.medians[i]))
             if default_idx not in [0, 1]:
                 default_idx = 0
             val = st.sidebar.selectbox(label, options=[0, 1], index=default_idx)
         else:
             val = st.sidebar.slider(
                 label,
-                min_value=float(round(stats["min"], 2)),
-                max_value=float(round(stats["max"], 2)),
-                value=float(round(stats["median"], 2)),
-                step=float(round(step, 2)),
+                min_value=float(feature_stats.mins[i]),
+                max_value=float(feature_stats.maxs[i]),
+                value=float(feature_stats.medians[i]),
+                step=float(feature_stats.steps[i]),
             )
     
         inputs[col] = val
     
-    # Convert inputs to model-ready DataFrame
-    input_df = pd.DataFrame([inputs], columns=FEATURE_COLS)
+    # Convert inputs to a model-ready (1, n_features) array in FEATURE_COLS order
+    input_arr = np.array([[inputs[col] for col in FEATURE_COLS]], dtype=np.float64)
     
     # ------------------------
     # Prediction Display
     # ------------------------
     
     # Predict churn probability
-    prob_churn = float(pipe.predict_proba(input_df)[0, 1])
+    prob_churn = float(pipe.predict_proba(input_arr)[0, 1])
     threshold = 0.5
     is_churner = prob_churn >= threshold
     label = "Likely to CHURN" if is_churner else "Likely to STAY"
@@ -208,7 +230,7 @@ def main():
     
     with st.expander("📋 Show Input Values"):
         st.dataframe(
-            input_df.T.rename(columns={0: "Value"}),
+            pd.DataFrame.from_dict(inputs, orient="index", columns=["Value"]),
             use_container_width=True
         )
     
@@ -32,6 +32,7 @@ setup(
     install_requires=[
         "pandas>=2.0.0",
         "numpy>=1.24.0",
+        "pyarrow>=12.0.0",
         "scikit-learn>=1.3.0",
         "xgboost>=2.0.0",
         "matplotlib>=3.7.0",